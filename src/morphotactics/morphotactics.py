@@ -3,41 +3,154 @@ from pynini.lib import pynutil
 from morphotactics.stem_guesser import StemGuesser
 from morphotactics.slot import Slot
 import pywrapfst
-from typing import Set
+from typing import Iterable
+from itertools import zip_longest
+
+# semiring zero of the tropical semiring (infinity), i.e. the weight of a non-accepting state
+# created once so that per-state finality checks do not allocate a new Weight each time
+_TROPICAL_ZERO = pynini.Weight.zero('tropical')
+
+# characters that pynini's string compiler treats specially (generated symbols and escapes)
+_PYNINI_SPECIAL_CHARS = frozenset('[]\\')
+
+# pynini.Arc converts a float weight through a string on every call, but takes a Weight as is
+_TROPICAL_ONE = pynini.Weight.one('tropical')
+
+def _rule_arcs(upper, lower, weight):
+  """
+  Returns the states and arcs of the FST transducing lower into upper
+  Rules made of plain strings are emitted directly as a chain of byte arcs,
+  padding the shorter side with epsilons exactly like pynini.cross
+  Other rules (empty or with pynini escapes) are built with pynini.cross
+
+  Args:
+    upper: str, upper alphabet symbols (output side)
+    lower: str, lower alphabet symbols (input side)
+    weight: float, weight of the rule
+  Returns:
+    (tuple) number of states and a tuple of (state, ilabel, olabel, weight, nextstate);
+      state 0 is the start state and the last state is the final state;
+      weights are tropical Weights so that they are converted once per rule, not once per arc
+  """
+  if (upper or lower) and _PYNINI_SPECIAL_CHARS.isdisjoint(upper + lower):
+    weight = pynini.Weight('tropical', weight)
+    labels = zip_longest(lower.encode('utf8'), upper.encode('utf8'), fillvalue=0)
+    arcs = tuple((state, ilabel, olabel, weight if state == 0 else _TROPICAL_ONE, state + 1)
+      for (state, (ilabel, olabel)) in enumerate(labels))
+    return len(arcs) + 1, arcs
+
+  rule = pynutil.add_weight(pynini.cross(lower, upper), weight)
+  arcs = tuple((state, arc.ilabel, arc.olabel, arc.weight, arc.nextstate)
+    for state in rule.states() for arc in rule.arcs(state))
+  return rule.num_states(), arcs
+
+def _state_map(start_state, base, num_states):
+  """
+  Returns a lookup table from the states of a small FST to states of the main FST
+  State 0 maps to start_state and states 1..num_states-1 map to base..base+num_states-2,
+  so remapping a state is a single list index instead of a branch
+
+  Args:
+    start_state: int, state in the main FST that state 0 is merged into
+    base: int, state in the main FST that state 1 is copied to
+    num_states: int, number of states of the small FST
+  Returns:
+    (list) maps each state of the small FST to its state in the main FST
+  """
+  return [start_state] + list(range(base, base + num_states - 1))
 
 # An iterative, polymorphic depth-first graph search algorithm
 # Runs in O(|V| + |E|) if the state updates are O(1)
 # Adapted from CMU 15-210, Parallel & Sequential Data Structures & Algorithms
+# Uses an explicit stack of ('enter', vertex) and ('finish', vertex) frames
+# instead of recursion, so deep slot graphs cannot overflow the Python stack
 # state: DFS state
 # visited: set of visited vertices
 # start_vertex: the start vertex
 # neighbors: function to get the neighbors of a vertex as a list
 # visit: function that updates state upon first visit to a vertex
 # revisit: function that updates state upon second visit to a vertex
-def _dfs(state, visited, start_vertex, neighbors, visit, revisit):
-  stack = [start_vertex]
+# finish: optional function that updates state once all of a vertex's neighbors have been visited
+def _dfs(state, visited, start_vertex, neighbors, visit, revisit, finish=None):
+  stack = [('enter', start_vertex)]
 
   while stack:
-    vertex = stack.pop()
-    if vertex in visited:
+    frame, vertex = stack.pop()
+    if frame == 'finish':
+      state = finish(state, vertex)
+    elif vertex in visited:
       state = revisit(state, vertex)
     else:
       state = visit(state, vertex)
       visited.add(vertex)
-      nbors = neighbors(vertex)
-      for nbor in nbors:
+      if finish:
+        stack.append(('finish', vertex))
+      # push in reverse so that neighbors are entered in their listed order
+      for nbor in reversed(neighbors(vertex)):
         if nbor not in visited:
-          stack.append(nbor)
+          stack.append(('enter', nbor))
   return state
 
-def compile(slots: Set[Slot]) -> pynini.Fst:
+def _adjacency(slot_map, starting_slots):
+  """
+  Builds the implicit Slot graph once as an adjacency dict
+  The starting Slots are the neighbors of the 'start' vertex
+
+  Args:
+    slot_map: dict mapping Slot names to Slots
+    starting_slots: dict mapping starting Slot names to Slots
+  Returns:
+    (dict) maps 'start' and each Slot name to a sequence of continuation class names
+  """
+  adj = { 'start': list(starting_slots.keys()) }
+  for name, slot in slot_map.items():
+    # read off the rules at compile time since Slot.rules (and their continuation classes) are public
+    # dict.fromkeys deduplicates the continuation class names in rule order
+    # works if the slot is a Slot or StemGuesser
+    adj[name] = tuple(dict.fromkeys(cc for (_, _, cont_classes, _) in slot.rules for (cc, _) in cont_classes if cc))
+  return adj
+
+def _finalize(fst, minimize):
+  """
+  Verifies a compiled FST, removes its epsilon transitions, optimizes it if it is
+  deterministic (and minimize is set) and sorts its arcs by input label
+
+  Args:
+    fst: the compiled FST, modified in place
+    minimize: bool, whether a deterministic FST should be optimized
+  Returns:
+    (Fst) fst
+  """
+  # verify the FST
+  if not fst.verify():
+    raise Exception('FST malformed')
+
+  # epsilon transitions may interfere with determining determinism
+  fst.rmepsilon()
+
+  # check both determinism properties with one (O(V+E)) property computation
+  deterministic = pywrapfst.I_DETERMINISTIC | pywrapfst.O_DETERMINISTIC
+  if minimize and fst.properties(deterministic, True) == deterministic:
+    # optimize() determinizes the FST, which we do not want if it's non-deterministic
+    fst.optimize()
+
+  # composing input strings with the FST (i.e. analysis) looks arcs up by input label
+  fst.arcsort(sort_type='ilabel')
+
+  return fst
+
+def compile(slots: Iterable[Slot], *, minimize: bool=True) -> pynini.Fst:
   """
   Returns an OpenFST FST representing the morphotactic rules of an entire lexicon
   Resolves all dependencies between continuation classes of multiple slots
   Note: no slot can be named 'start'
 
   Args:
-    slots: set of Slot objects (not a list)
+    slots: iterable of Slot objects (e.g. a set, a list or a generator), iterated only once;
+      Slot names must be unique
+    minimize: bool, optional
+      optimize (determinize and minimize) the FST if it is deterministic;
+      disable for lexicons where minimization is too slow or blows up the FST
   Returns:
     (Fst) FST connecting the slots
   """
@@ -46,14 +159,17 @@ def compile(slots: Set[Slot]) -> pynini.Fst:
   # continuation class' FST, and we might not have finished mutating it
   # by the time we are doing the concatenation
   # thus we must manually add the arcs from the rules to the continuation classes
-  # through 2 passes (1 pass to create the rules, 1 pass to add the arcs)
+  # in one DFS (create the rules on first visit, add the arcs when a Slot finishes)
   
   # we use DFS to process the Slots that are reachable from the starting Slots
   # Slots are the vertices, and transitions between classes are edges
 
   slot_map = { slot.name:slot for slot in slots }
-  starting_slots = { slot.name:slot for slot in slots if slot.start }
+  # read the starting Slots off slot_map so that slots is iterated only once
+  starting_slots = { name:slot for (name, slot) in slot_map.items() if slot.start }
   fst = pynini.Fst()
+  # maps (upper, lower, weight) to the rule's states and arcs; scoped to this compile
+  built_rules = {}
 
   if len(starting_slots) == 0:
     raise Exception('need at least 1 slot to be a starting slot')
@@ -71,81 +187,73 @@ def compile(slots: Set[Slot]) -> pynini.Fst:
       return start_states
     
     slot = slot_map[vertex]
+    # final states of a previous compile of the same Slot refer to another FST
+    del slot.final_states[:]
     slot_start_state = fst.add_state()
+    Arc = pynini.Arc # local name lookup in the arc-copying loops below
 
     if isinstance(slot, StemGuesser):
       # copy the regex FSA to fst with pywrapfst
       fsa = slot.fst
-      old_num_states = fst.num_states()
+      remap = _state_map(slot_start_state, fst.num_states(), fsa.num_states())
+      # the FSA's start state need not be state 0 (e.g. after determinization); swap so that it maps to slot_start_state
+      fsa_start = fsa.start()
+      remap[0], remap[fsa_start] = remap[fsa_start], remap[0]
       fst.add_states(fsa.num_states() - 1) # do not need to copy over slot_start_state again
       for state in fsa.states():
-        new_state = slot_start_state if state == 0 else (old_num_states + state - 1)
+        new_state = remap[state]
 
         # final states of FST may not be accepting, so must manually find the final states
-        if fsa.final(state) != pynini.Weight.zero('tropical'):
+        if fsa.final(state) != _TROPICAL_ZERO:
           slot.final_states.append(new_state)
 
         for arc in fsa.arcs(state):
-          nextstate = slot_start_state if arc.nextstate == 0 else (old_num_states + arc.nextstate - 1)
-          fst.add_arc(new_state, pynini.Arc(arc.ilabel, arc.olabel, arc.weight, nextstate))
+          fst.add_arc(new_state, Arc(arc.ilabel, arc.olabel, arc.weight, remap[arc.nextstate]))
     else: # regular Slot
       # create an FST for each rule with pynini and copy over to fst with pywrapfst
+      # transitions within same slot could have different continuation classes
+      # we will concatenate the rule with the continuation class' FST once the Slot finishes
+      # place lower on the input side so that FST can take in input from lower alphabet to perform analysis
+      # the same rule often recurs across the Slots of a lexicon, so each is built once per compile
+      rules = []
       for (upper, lower, _, rule_weight) in slot.rules:
-        # transitions within same slot could have different continuation classes
-        # we will concatenate the rule with the continuation class' FST in the second DFS
+        key = (upper, lower, rule_weight)
+        if key not in built_rules:
+          built_rules[key] = _rule_arcs(*key)
+        rules.append(built_rules[key])
 
-        # place lower on the input side so that FST can take in input from lower alphabet to perform analysis
-        rule = pynutil.add_weight(pynini.cross(lower, upper), rule_weight)
+      # allocate the states of every rule at once; each rule shares slot_start_state
+      base = fst.num_states()
+      fst.add_states(sum(num_states for (num_states, _) in rules) - len(rules))
 
-        # copy rule to fst arc by arc, starting from state start_slot
-        old_num_states = fst.num_states()
-        fst.add_states(rule.num_states() - 1) # do not need to copy over slot_start_state again
-        
-        for state in rule.states():
-          new_state = slot_start_state if state == 0 else (old_num_states + state - 1)
-          for arc in rule.arcs(state):
-            nextstate = slot_start_state if arc.nextstate == 0 else (old_num_states + arc.nextstate - 1)
-            fst.add_arc(new_state, pynini.Arc(arc.ilabel, arc.olabel, arc.weight, nextstate))
-
-        rule_final_state = fst.num_states() - 1
-        slot.final_states.append(rule_final_state)
+      # remap (source, ilabel, olabel, weight, destination) of every rule, then emit them in one loop
+      arcs = []
+      for (num_states, rule_arcs) in rules:
+        remap = _state_map(slot_start_state, base, num_states)
+        arcs.extend((remap[state], ilabel, olabel, weight, remap[nextstate])
+          for (state, ilabel, olabel, weight, nextstate) in rule_arcs)
+
+        # the last state of a rule's FST is its final state
+        slot.final_states.append(remap[-1])
+        base += num_states - 1
+
+      for (new_state, ilabel, olabel, weight, nextstate) in arcs:
+        fst.add_arc(new_state, Arc(ilabel, olabel, weight, nextstate))
         
     # add current slot's FST to finished set of slots
     start_states[vertex] = slot_start_state
     return start_states
   
-  def revisit(state, vertex): 
-    # do nothing because Slot only needs to be processed once
-    return state
-
-  def neighbors(vertex):
-    if vertex == 'start':
-      return list(starting_slots.keys())
-    conts = set()
-    # we only care about visiting the continuation class so only retrieve its name
-    # the linking of rules to continuation class' FSTs is done in the finish function
-    slot = slot_map[vertex]
-    # works if the slot is a Slot or StemGuesser
-    for (_, _, continuation_classes, _) in slot.rules:
-      conts |= set([cc for (cc, _) in continuation_classes if cc])
-    return list(conts)
-  
-  # make a first pass through all of the Slots with DFS
-  # convert each Slot's rules into an FST
-  # DFS guarantees that the Slots processed are reachable from the start
-
-  # start_states maps Slot name to start state of the Slot so that we can concatenate a rule with its continuation classes
-  start_states = {}
-  start_states = _dfs(start_states, set(), 'start', neighbors, first_visit, revisit)
-
-  # second pass through all of the Slots
-  # by this time, all Slots reachable from the start have been converted into FSTs
+  # once all of a Slot's continuation classes have been visited, their start states exist
   # add transition from each rule to continuation class' start state
   # glue all Slots together, Slot by Slot
   # note that we cannot concatenate each Slot to its continuation's FST 
   #    because its continuation's FST is not guaranteed to have finished processing
-  def second_pass(_, vertex):
+  def finish(state, vertex):
+    start_states = state
+
     if vertex == 'start':
+      # 'start' finishes last, after every Slot reachable from the start has been visited
       # add an epsilon transition between each starting state and starting slots
       # will be removed during optimization
       # we do not union the starting slots because we do not know when the slots will be finished processing
@@ -154,47 +262,39 @@ def compile(slots: Set[Slot]) -> pynini.Fst:
         # note: we currently do not support setting weights for starting classes
         arc = pynini.Arc(0, 0, 0.0, start_states[start_slot])
         fst.add_arc(s, arc)
-      return
+      return start_states
     
     slot = slot_map[vertex]
     if isinstance(slot, StemGuesser):
       # only care about a StemGuesser's continuation classes
       # StemGuesser does not assign weights or transitions
       cont_classes = slot.rules[0][2]
-      for final_state in slot.final_states:
-        # add epsilon transition between FSA's final states and continuation classes
-        for (continuation_class, weight) in cont_classes:
-          if not continuation_class:
-            # mark final_state as accepting by setting weight to semiring One or weight specified by user
-            fst.set_final(final_state, weight)
-          else:
-            arc = pynini.Arc(0, 0, weight, start_states[continuation_class])
-            fst.add_arc(final_state, arc)
+      rule_final_states = [(cont_classes, final_state) for final_state in slot.final_states]
     else: # regular Slot
-      for ((_, _, cont_classes, _), final_state) in zip(slot.rules, slot.final_states):
-        # add epsilon transition between each rule's final state and continuation classes
-        # note: we currently do not support setting weights for continuation classes
-        for (continuation_class, weight) in cont_classes:
-          if not continuation_class:
-            # mark final_state as accepting by setting weight to semiring One or weight specified by user
-            fst.set_final(final_state, weight)
-          else:
-            arc = pynini.Arc(0, 0, weight, start_states[continuation_class])
-            fst.add_arc(final_state, arc)
-    return
-  
-  _dfs(None, set(), 'start', neighbors, second_pass, revisit)
+      rule_final_states = [(cont_classes, final_state)
+        for ((_, _, cont_classes, _), final_state) in zip(slot.rules, slot.final_states)]
 
-  # verify the FST
-  if not fst.verify():
-    raise Exception('FST malformed')
+    for (cont_classes, final_state) in rule_final_states:
+      # add epsilon transition between each rule's (or FSA's) final state and continuation classes
+      for (continuation_class, weight) in cont_classes:
+        if not continuation_class:
+          # mark final_state as accepting by setting weight to semiring One or weight specified by user
+          fst.set_final(final_state, weight)
+        else:
+          # continuation_class was visited before vertex finished (possibly as an ancestor in a cycle)
+          arc = pynini.Arc(0, 0, weight, start_states[continuation_class])
+          fst.add_arc(final_state, arc)
+    return start_states
 
-  # epsilon transitions may interfere with determining determinism
-  fst.rmepsilon()
+  def revisit(state, vertex):
+    # do nothing because Slot only needs to be processed once
+    return state
 
-  if fst.properties(pywrapfst.I_DETERMINISTIC, True) == pywrapfst.I_DETERMINISTIC and\
-    fst.properties(pywrapfst.O_DETERMINISTIC, True) == pywrapfst.O_DETERMINISTIC:
-    # optimize() determinizes the FST, which we do not want if it's non-deterministic
-    fst.optimize()
+  # a single DFS converts each Slot's rules into an FST on first visit
+  #   and connects the Slot to its continuation classes once it finishes
+  # DFS guarantees that the Slots processed are reachable from the start
+  # start_states maps Slot name to start state of the Slot so that we can concatenate a rule with its continuation classes
+  adj = _adjacency(slot_map, starting_slots)
+  _dfs({}, set(), 'start', adj.__getitem__, first_visit, revisit, finish)
 
-  return fst
+  return _finalize(fst, minimize)
@@ -1,5 +1,16 @@
 import pynini
-from typing import List, Tuple, Optional
+from array import array
+from typing import List, Tuple, Optional, NamedTuple
+
+class Rule(NamedTuple):
+  """
+  A rule of a Slot: (upper alphabet symbols, lower alphabet symbols, list of continuation classes, rule weight)
+  Still a tuple, so plain 4-tuples compare equal to Rules and Rules can be unpacked like 4-tuples
+  """
+  upper: str
+  lower: str
+  cont_classes: List[Tuple[Optional[str], float]]
+  weight: float
 
 class Slot:
   """
@@ -14,8 +25,9 @@ class Slot:
       name of the slot
     fst: pynini.Fst
       a StemGuesser's compiled FSA
-    rules: list[tuple[str, str, list[tuple[str, float]], float]]
-      a list of tuples (upper alphabet symbols, lower alphabet symbols, list of continuation classes, rule weight)
+    rules: tuple[Rule]
+      a tuple of Rules (upper alphabet symbols, lower alphabet symbols, list of continuation classes, rule weight)
+        rules can be given as plain 4-tuples; they are converted to Rules
         example: ('ni-', 'ni', [('RefObj', 0.8), (None, 0.3), ('VerbStem', 0.4)], 0.0)
         A rule's destination state is a final state if None is present in the continuation class list
         The rule weight is the weight of the transition from the slot's initial state to this particular rule
@@ -25,10 +37,14 @@ class Slot:
         If a cont class is None, then the weight of the accepting state is the weight specified in the tuple
     start: bool, optional
       if the slot is one of the starting slots (root class in LEXC)
-    final_states: list[int]
+    final_states: array[int]
       used by the compiler to store a Slot's accepting states in the compiled FST
+      packed as C ints (array('i')) rather than a list of Python ints
   """
 
+  # fixed attribute layout: no per-instance __dict__
+  __slots__ = ('name', 'fst', 'rules', 'start', 'final_states')
+
   def __init__(self, name: str, rules: List[Tuple[str, str, List[Tuple[Optional[str], float]], float]], start: bool=False):
     """
     Initializes Slot state
@@ -39,12 +55,35 @@ class Slot:
       rules: list[tuple[str, str, list[tuple[str, float]], float]]
       start: bool
     """
+    rules = tuple(rules) # validation must not exhaust an iterator of rules
+    if any(not cont_classes for (_, _, cont_classes, _) in rules):
+      raise Exception('Need to specify at least one continuation class.\
+          Use None to indicate if StemGuesser is terminal')
+    self._set_state(name, rules, start)
+
+  @classmethod
+  def _unchecked(cls, name: str, rules: List[Tuple[str, str, List[Tuple[Optional[str], float]], float]], start: bool=False) -> 'Slot':
+    """
+    Internal: creates a Slot without validating its rules
+    Only for rules generated programmatically that are known to be valid
+    (e.g. large stem lists), where validation is pure overhead
+
+    Args:
+      name: string
+      rules: list[tuple[str, str, list[tuple[str, float]], float]]
+      start: bool
+    Returns:
+      (Slot) the new Slot
+    """
+    slot = cls.__new__(cls)
+    slot._set_state(name, rules, start)
+    return slot
+
+  def _set_state(self, name, rules, start):
+    # shared by __init__ and _unchecked; rules are assumed to be valid
     self.name = name
     self.fst = None
-    for (_, _, cont_classes, _) in rules:
-      if len(cont_classes) == 0:
-        raise Exception('Need to specify at least one continuation class.\
-            Use None to indicate if StemGuesser is terminal')
-    self.rules = rules # list of rules and their continuation classes
+    # rules and their continuation classes, as Rules so that fields are accessed by name
+    self.rules = tuple(rule if isinstance(rule, Rule) else Rule(*rule) for rule in rules)
     self.start = start
-    self.final_states = []
\ No newline at end of file
+    self.final_states = array('i')
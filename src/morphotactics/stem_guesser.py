@@ -1,6 +1,164 @@
 import pynini
 from morphotactics.slot import Slot
 from typing import List, Dict, Tuple, Optional
+from functools import lru_cache
+from itertools import groupby
+
+# characters with a special meaning in a minimal word constraint: scope, union, sigma and quantifiers
+_REGEX_OPERATORS = frozenset('[]().?*+')
+
+# quantifiers apply to the FST just before them
+_QUANTIFIERS = frozenset('?*+')
+
+# fst_stack entries that collect atoms until their closing bracket or parenthesis
+_GROUP_KINDS = frozenset(('scope', 'union'))
+
+
+def _optimize_fsa(fsa):
+  """
+  Determinizes and minimizes an unweighted FSA for composition with input strings
+  Acceptors of strings are always determinizable, so unlike optimize() nothing needs to be checked first
+
+  Args:
+    fsa: Fst, modified in place if it is not replaced
+  Returns:
+    (Fst) the epsilon-free, deterministic, minimal FSA with its arcs sorted by input label
+  """
+  fsa.rmepsilon()
+  fsa = pynini.determinize(fsa)
+  fsa.minimize()
+  # composition with input strings looks arcs up by input label
+  fsa.arcsort(sort_type='ilabel')
+  return fsa
+
+@lru_cache(maxsize=32)
+def _alphabet_fsas(alphabet_items):
+  """
+  Builds each phone class' FSA and the sigma FSA of an alphabet
+  Memoized because many constraints share one alphabet; callers must copy the FSAs before mutating them
+
+  Args:
+    alphabet_items: tuple of (phone class, tuple of symbols) pairs, sorted by phone class
+  Returns:
+    (tuple) dict mapping phone classes to their FSAs, and the sigma FSA (None if the alphabet is empty)
+  """
+  # phone classes could overlap so phones to set first
+  symbols = {symb for (_, symbol_class) in alphabet_items for symb in symbol_class}
+  class_fsts = { symbol_class: pynini.union(*symbs).optimize() for (symbol_class, symbs) in alphabet_items if symbs }
+  sigma_fst = pynini.union(*symbols).optimize() if symbols else None
+  return class_fsts, sigma_fst
+
+@lru_cache(maxsize=256)
+def _compile_constraint(regex, alphabet_items):
+  """
+  Converts a limited PCRE regex (scope, quantification) to an optimized OpenFst FSA
+  Memoized because the same minimal word constraint and alphabet recur across StemGuessers;
+  callers must copy the FSA before mutating it
+
+  Args:
+    regex: str, a minimal word constraint expressed as a limited regular expression of phone classes
+    alphabet_items: tuple of (phone class, tuple of symbols) pairs, sorted by phone class
+  Returns:
+    (Fst) the optimized FSA
+  """
+  alphabet = dict(alphabet_items)
+
+  # a constraint without operators or phone classes is just a string, i.e. a single linear chain
+  if _REGEX_OPERATORS.isdisjoint(regex) and alphabet.keys().isdisjoint(regex):
+    return _optimize_fsa(pynini.accep(regex))
+
+  # pynini.union, closure and + return new FSTs, so these are only copied when pushed onto fst_stack
+  class_fsts, sigma_fst = _alphabet_fsas(alphabet_items)
+
+  stack = [] # check for matching parens
+  fst_stack = [] # to be used in union or scope mode
+
+  # () means scope / grouping - concatenation
+  # [] means match anything inside - union
+  # . means match any character in the alphabet (not including epsilon) - sigma
+  # quantifiers: ?, *, +
+  def close_group(group):
+    # a group nested in another group is one of the enclosing group's atoms
+    if fst_stack and fst_stack[-1][0] in _GROUP_KINDS:
+      fst_stack[-1][1].append(group)
+    else:
+      fst_stack.append(('processed', group))
+
+  # a quantifier needs something before it to quantify
+  if regex[:1] in _QUANTIFIERS:
+    raise Exception('Empty quantification')
+
+  for ch in regex:
+    is_class = ch in alphabet
+    if ch == '[':
+      stack.append(ch)
+      # collect the union's atoms and union them all at once upon the closing bracket
+      fst_stack.append(('union', []))
+    elif ch == '(':
+      stack.append(ch)
+      # collect the scope's atoms and concatenate them all at once upon the closing parenthesis
+      fst_stack.append(('scope', []))
+    elif ch == ')':
+      if stack.pop(-1) != '(':
+        raise Exception('Unmatched parentheses')
+      (_, atoms) = fst_stack.pop()
+      if all(isinstance(atom, str) for atom in atoms):
+        # a scope of plain symbols is a single linear chain
+        scope = pynini.accep(''.join(atoms))
+      else:
+        scope = pynini.accep('')
+        for atom in atoms:
+          scope.concat(atom)
+      close_group(scope)
+    elif ch == ']':
+      if stack.pop(-1) != '[':
+        raise Exception('Unmatched brackets')
+      (_, atoms) = fst_stack.pop()
+      close_group(pynini.union(*atoms) if atoms else pynini.accep(''))
+    elif fst_stack and fst_stack[-1][0] in _GROUP_KINDS:
+      # collect only the current chars; a scope concatenates and a union unions them when closed
+      fst_stack[-1][1].append(class_fsts[ch] if is_class else ch)
+    # sigma
+    elif ch == '.':
+      if not alphabet:
+        raise Exception('Alphabet required if regex includes sigma')
+      # make copy each time to avoid state issues
+      fst_stack.append(('sigma', sigma_fst.copy()))
+    # quantification - perform closure on last FST
+    elif ch == '?':
+      fst_stack[-1] = (fst_stack[-1][0], pynini.closure(fst_stack[-1][1], 0, 1))
+    elif ch == '*':
+      # the Kleene closure already accepts the empty string, including when the entire regex
+      # is a Kleene closure or the previous character is sigma, so no union with '' is needed
+      fst_stack[-1] = (fst_stack[-1][0], pynini.closure(fst_stack[-1][1]))
+    elif ch == '+':
+      fst_stack[-1] = (fst_stack[-1][0], pynini.closure(fst_stack[-1][1], 1))
+    else:
+      if not is_class:
+        # keep plain symbols as strings; runs of them are compiled together below
+        fst_stack.append(('symbol', ch))
+      else:
+        fst_stack.append(('symbol', class_fsts[ch].copy()))
+    
+  if len(stack) > 0:
+    raise Exception('Unmatched brackets')
+
+  # compile each run of consecutive plain symbols with a single accep call
+  # a quantified symbol is already an FST, so it ends the run before it
+  fsts = []
+  for (is_str, run) in groupby((f for (_, f) in fst_stack), key=lambda f: isinstance(f, str)):
+    if is_str:
+      fsts.append(pynini.accep(''.join(run)))
+    else:
+      fsts.extend(run)
+
+  # concatenate in place; + would copy the growing FST on every step
+  # every FST in fsts is its own copy, so the first one can be mutated
+  fst = fsts[0] if fsts else pynini.accep('')
+  for f in fsts[1:]:
+    fst.concat(f)
+
+  return _optimize_fsa(fst)
 
 
 class StemGuesser(Slot):
@@ -9,6 +167,8 @@ class StemGuesser(Slot):
   to identify stems in words so as to separate the stem from its affixes,
   which will be processed by rules in other Slots
   """
+  __slots__ = () # all attributes are declared by Slot
+
   def __init__(self, min_word_constraint: str, name: str, cont_classes: List[Tuple[Optional[str], float]], alphabet: Dict[str, List[str]]={}, start: bool=False):
     """
     Converts a limited PCRE regex (scope, quantification) to an OpenFst FST.
@@ -32,95 +192,11 @@ class StemGuesser(Slot):
       start: bool, optional
         the slot is one of root slots (root class in LEXC)
     """
-
-    # phone classes could overlap so phones to set first
-    symbols = {symb for symbol_class in alphabet.values() for symb in symbol_class}
-
-    stack = [] # check for matching parens
-    fst = None
-    fst_stack = [] # to be used in union or scope mode
-    regex = min_word_constraint
-
-    # () means scope / grouping - concatenation
-    # [] means match anything inside - union
-    # . means match any character in the alphabet (not including epsilon) - sigma
-    # quantifiers: ?, *, +
-    for i in range(len(regex)):
-      if regex[i] == '[':
-        stack.append(regex[i])
-        fst_stack.append(('union', pynini.accep('')))
-      elif regex[i] == '(':
-        stack.append(regex[i])
-        fst_stack.append(('scope', pynini.accep('')))
-      elif regex[i] == ')':
-        if stack.pop(-1) != '(':
-          raise Exception('Unmatched parentheses')
-        fst_stack[-1] = ('processed', fst_stack[-1][1])
-      elif regex[i] == ']':
-        if stack.pop(-1) != '[':
-          raise Exception('Unmatched brackets')
-        fst_stack[-1] = ('processed', fst_stack[-1][1])
-      elif fst_stack and fst_stack[-1][0] in ['scope', 'union']:
-        if fst_stack[-1][0] == 'scope':
-          # concatenate only the current chars
-          if regex[i] not in alphabet:
-            fst_stack[-1][1].concat(regex[i])
-          else:
-            fst_stack[-1][1].concat(pynini.union(*alphabet[regex[i]]))
-        elif fst_stack[-1][0] == 'union':
-          if fst_stack[-1][1].num_states() == 1:
-            # make sure we don't union with empty string
-            if regex[i] not in alphabet:
-              fst_stack[-1][1].concat(regex[i])
-            else:
-              fst_stack[-1][1].concat(pynini.union(*alphabet[regex[i]]))
-          else:
-            # union only the current chars within the matching parens
-            if regex[i] not in alphabet:
-              fst_stack[-1][1].union(regex[i])
-            else:
-              fst_stack[-1][1].union(pynini.union(*alphabet[regex[i]]))
-      # sigma
-      elif regex[i] == '.':
-        if not alphabet:
-          raise Exception('Alphabet required if regex includes sigma')
-        # make copy each time to avoid state issues
-        sigma = pynini.union(*list(symbols))
-        fst_stack.append(('sigma', sigma))
-      # quantification - perform closure on last FST
-      elif regex[i] == '?':
-        if i == 0:
-          raise Exception('Empty quantification')
-        fst_stack[-1] = (fst_stack[-1][0], pynini.closure(fst_stack[-1][1], 0, 1))
-      elif regex[i] == '*':
-        if i == 0:
-          raise Exception('Empty quantification')
-
-        fst_stack[-1] = (fst_stack[-1][0], pynini.closure(fst_stack[-1][1]))
-        
-        # if the entire regex is a Kleene closure or previous character is sigma, accept empty string too
-        if (len(fst_stack) == 1 and i == len(regex) - 1) or (fst_stack and fst_stack[-1][0] == 'sigma'):
-          fst_stack[-1] = (fst_stack[-1][0], pynini.union(fst_stack[-1][1], ''))
-      elif regex[i] == '+':
-        if i == 0:
-          raise Exception('Empty quantification')
-        fst_stack[-1] = (fst_stack[-1][0], pynini.closure(fst_stack[-1][1], 1))
-      else:
-        if regex[i] not in alphabet:
-          fst_stack.append(('symbol', pynini.accep(regex[i])))
-        else:
-          fst_stack.append(('symbol', pynini.union(*alphabet[regex[i]])))
-    
-    for (_, f) in fst_stack:
-      if not fst: # first FST
-        fst = f
-      else:
-        fst = fst + f
-
-    if len(stack) > 0:
-      raise Exception('Unmatched brackets')
+    alphabet_items = tuple(sorted((symbol_class, tuple(symbs)) for (symbol_class, symbs) in alphabet.items()))
+    fsa = _compile_constraint(min_word_constraint, alphabet_items)
 
     # upper/lower alphabet symbol transitions and weights not used by compiler
     rules = [('', '', cont_classes, 0.0)]
     super(StemGuesser, self).__init__(name, rules, start)
-    self.fst = fst.optimize()
+    # copy so that mutating this StemGuesser's FSA does not change the cached one
+    self.fst = fsa.copy()
@@ -1,20 +1,30 @@
-from morphotactics.slot import Slot
+from morphotactics.slot import Slot, Rule
 import pytest
 
-def test_slot_start_false_by_default():
-  slot = Slot('', [])
+# Slot._unchecked skips rule validation but must set the same state as Slot
+slot_constructors = [Slot, Slot._unchecked]
+
+@pytest.mark.parametrize('make_slot', slot_constructors)
+def test_slot_start_false_by_default(make_slot):
+  slot = make_slot('', [])
   assert not slot.start
 
-def test_slot_state():
+@pytest.mark.parametrize('make_slot', slot_constructors)
+def test_slot_state(make_slot):
   dummy_class = 'SomeClass'
-  dummy_rule = ('', '', [(None, 0.0)], 0.0)
-  slot = Slot('SomeClass', [dummy_rule], start=True)
+  dummy_rule = ('a', 'b', [('OtherClass', 0.0), (None, 0.0)], 0.0)
+  slot = make_slot(dummy_class, [dummy_rule], start=True)
   assert slot.start
   assert slot.name == dummy_class
-  assert len(slot.rules) == 1
-  assert slot.rules[0] == dummy_rule
+  assert slot.rules == (dummy_rule,)
 
 def test_empty_cont_class_raises_exception():
   with pytest.raises(Exception) as excinfo:
     slot = Slot('', [('', '', [], 0.0)], start=True)
-  assert 'Need to specify at least one continuation class' in str(excinfo.value)
\ No newline at end of file
+  assert 'Need to specify at least one continuation class' in str(excinfo.value)
+
+def test_rules_are_converted_to_rule_records():
+  slot = Slot('SomeClass', [('a', 'b', [(None, 0.5)], 1.0)])
+  rule = slot.rules[0]
+  assert isinstance(rule, Rule)
+  assert (rule.upper, rule.lower, rule.cont_classes, rule.weight) == ('a', 'b', [(None, 0.5)], 1.0)
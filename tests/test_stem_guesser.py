@@ -1,5 +1,7 @@
 from morphotactics.stem_guesser import StemGuesser
 import pynini
+import pywrapfst
+from tests.test_compiler import _acceptor, all_rejected
 
 nahuatl_alphabet = {
   'C': ['m', 'n', 'p', 't', 'k', 'kw', 'h', 'ts', 'tl', 'ch', 's', 'l', 'x', 'j', 'w'], 
@@ -7,17 +9,41 @@ nahuatl_alphabet = {
 }
 bimoraic_fsa = StemGuesser('[CV]*V[CV]*V[CV]*', '', [(None, 0.0)], nahuatl_alphabet).fst
 bimoraic_fsa_sigma_form = StemGuesser('.*V.*V.*', '', [(None, 0.0)], nahuatl_alphabet).fst
-# note: StemGuesser('.*V.*V.*', '', [(None, 0.0)], nahuatl_alphabet) != StemGuesser('[CV]*V[CV]*V[CV]*', '', [(None, 0.0)], nahuatl_alphabet)
-# because of different state numberings during state optimization but they accept the same language still
+# note: both forms are kept (rather than one FSA shared under two names) so that each regex form is tested;
+# their FSAs may differ in state numbering but accept the same language (see test_bimoraic_forms_are_equivalent)
 
 def accepts(fst, input_str):
-  return pynini.compose(input_str, fst).num_states() != 0
-
-def is_bimoraic(oov_stem):
-  return accepts(bimoraic_fsa, oov_stem)
-
-def is_bimoraic_sigma_form(oov_stem):
-  return accepts(bimoraic_fsa_sigma_form, oov_stem)
+  # StemGuesser FSAs are acceptors; an empty (connected) intersection has no start state
+  return pynini.intersect(_acceptor(input_str), fst).start() != pywrapfst.NO_STATE_ID
+
+def all_accepted(fst, inputs):
+  # intersects the union of the strings with fst once instead of checking each string separately
+  accepted = pynini.intersect(pynini.union(*inputs).optimize(), fst)
+  return accepted.start() != pywrapfst.NO_STATE_ID and set(accepted.paths().istrings()) == set(inputs)
+
+bimoraic_stems = [
+  'paaki', # CVVCV
+  'paak', # CVVC
+  'posteki', # CVCCVCV
+  'miktilia', # CVCCVCVV
+  'aa', # VV
+  'ai', # VV
+  'oatl', # VVC
+  'papiko', # CVCVCV
+  'moo', # CVV
+  'mio', # CVV
+  'tami', # CVCV
+  'xojlito', # CVCCVCV
+  'soomi', # CVVCV
+]
+non_bimoraic_stems = [
+  'atl', # VC
+  'ak', # VC
+  'ah', # VC
+  'a', # V
+  'p', # C
+  'pa', # CV
+]
 
 
 def test_sigma_concatenated():
@@ -121,51 +147,18 @@ def test_symbol_closure():
   assert not accepts(fst, 'ab')
 
 def test_bimoraic_fsa():
-  assert is_bimoraic('paaki') # CVVCV
-  assert is_bimoraic('paak') # CVVC
-  assert is_bimoraic('posteki') # CVCCVCV
-  assert is_bimoraic('miktilia') # CVCCVCVV
-
-  assert is_bimoraic('aa') # VV
-  assert is_bimoraic('ai') # VV
-  assert is_bimoraic('oatl') # VVC
-  assert is_bimoraic('papiko') # CVCVCV
-  assert is_bimoraic('moo') # CVV
-  assert is_bimoraic('mio') # CVV
-  assert is_bimoraic('tami') # CVCV
-  assert is_bimoraic('xojlito') # CVCCVCV
-  assert is_bimoraic('soomi') # CVVCV
-
-  assert not is_bimoraic('atl') # VC
-  assert not is_bimoraic('ak') # VC
-  assert not is_bimoraic('ah') # VC
-  assert not is_bimoraic('a') # V
-  assert not is_bimoraic('p') # C
-  assert not is_bimoraic('pa') # CV
+  assert all_accepted(bimoraic_fsa, bimoraic_stems)
+  assert all_rejected(bimoraic_fsa, non_bimoraic_stems)
 
 def test_bimoraic_fsa_sigma_form():
   # bimoraic regex with sigma instead of [CV]
-  assert is_bimoraic_sigma_form('paaki') # CVVCV
-  assert is_bimoraic_sigma_form('paak') # CVVC
-  assert is_bimoraic_sigma_form('posteki') # CVCCVCV
-  assert is_bimoraic_sigma_form('miktilia') # CVCCVCVV
-
-  assert is_bimoraic_sigma_form('aa') # VV
-  assert is_bimoraic_sigma_form('ai') # VV
-  assert is_bimoraic_sigma_form('oatl') # VVC
-  assert is_bimoraic_sigma_form('papiko') # CVCVCV
-  assert is_bimoraic_sigma_form('moo') # CVV
-  assert is_bimoraic_sigma_form('mio') # CVV
-  assert is_bimoraic_sigma_form('tami') # CVCV
-  assert is_bimoraic_sigma_form('xojlito') # CVCCVCV
-  assert is_bimoraic_sigma_form('soomi') # CVVCV
-
-  assert not is_bimoraic_sigma_form('atl') # VC
-  assert not is_bimoraic_sigma_form('ak') # VC
-  assert not is_bimoraic_sigma_form('ah') # VC
-  assert not is_bimoraic_sigma_form('a') # V
-  assert not is_bimoraic_sigma_form('p') # C
-  assert not is_bimoraic_sigma_form('pa') # CV
+  assert all_accepted(bimoraic_fsa_sigma_form, bimoraic_stems)
+  assert all_rejected(bimoraic_fsa_sigma_form, non_bimoraic_stems)
+
+def test_bimoraic_forms_are_equivalent():
+  # both FSAs are determinized and minimized, as pynini.equivalent requires
+  assert pynini.equivalent(bimoraic_fsa, bimoraic_fsa_sigma_form)
+  assert bimoraic_fsa.num_states() == bimoraic_fsa_sigma_form.num_states()
 
 def test_closure_no_alphabet():
   fst = StemGuesser('CV*', '', [(None, 0.0)]).fst
@@ -231,3 +224,61 @@ def test_union_concat_scope():
 
   fst = StemGuesser('[abc](ce)[fgh]', '', [(None, 0.0)]).fst
   assert accepts(fst, 'acef')
+
+def test_scope_with_phone_classes():
+  fst = StemGuesser('(CV)+', '', [(None, 0.0)], nahuatl_alphabet).fst
+  assert accepts(fst, 'ta')
+  assert accepts(fst, 'kwatla')
+  assert not accepts(fst, '')
+  assert not accepts(fst, 'tak')
+  assert not accepts(fst, 'at')
+
+def test_cached_fsa_is_copied():
+  first = StemGuesser('.*V.*V.*', 'first', [(None, 0.0)], nahuatl_alphabet)
+  second = StemGuesser('.*V.*V.*', 'second', [(None, 0.0)], nahuatl_alphabet)
+  assert first.fst is not second.fst
+  # mutating one StemGuesser's FSA leaves the other (and the cache) untouched
+  first.fst.concat('b')
+  assert accepts(second.fst, 'tapa')
+  assert not accepts(second.fst, 'tapab')
+  assert accepts(StemGuesser('.*V.*V.*', 'third', [(None, 0.0)], nahuatl_alphabet).fst, 'tapa')
+
+def test_literal_constraint():
+  fst = StemGuesser('tapa', '', [(None, 0.0)], nahuatl_alphabet).fst
+  assert accepts(fst, 'tapa')
+  assert not accepts(fst, 'tap')
+  assert not accepts(fst, 'tapat')
+
+def test_union_is_exactly_its_atoms():
+  fst = StemGuesser('[ab]', '', [(None, 0.0)]).fst
+  assert accepts(fst, 'a')
+  assert accepts(fst, 'b')
+  assert not accepts(fst, '')
+  assert not accepts(fst, 'ab')
+
+def test_quantifier_applies_to_last_symbol_of_a_run():
+  fst = StemGuesser('tap*a', '', [(None, 0.0)]).fst
+  assert accepts(fst, 'taa')
+  assert accepts(fst, 'tapppa')
+  assert not accepts(fst, 'tatapa')
+
+def test_nested_groups():
+  fst = StemGuesser('(a(bc))', '', [(None, 0.0)]).fst
+  assert accepts(fst, 'abc')
+  assert not accepts(fst, 'a')
+
+  fst = StemGuesser('[a(bc)]', '', [(None, 0.0)]).fst
+  assert accepts(fst, 'a')
+  assert accepts(fst, 'bc')
+  assert not accepts(fst, 'abc')
+
+  fst = StemGuesser('([ab]c)+', '', [(None, 0.0)]).fst
+  assert accepts(fst, 'ac')
+  assert accepts(fst, 'acbc')
+  assert not accepts(fst, 'ab')
+
+def test_fsa_is_deterministic_and_minimal():
+  for regex in ['.*C', '.*V', '.+', 'o.+', '[CV]*V[CV]*V[CV]*']:
+    fst = StemGuesser(regex, '', [(None, 0.0)], nahuatl_alphabet).fst
+    assert fst.properties(pywrapfst.I_DETERMINISTIC | pywrapfst.NO_EPSILONS, True) == pywrapfst.I_DETERMINISTIC | pywrapfst.NO_EPSILONS
+    assert fst.copy().minimize().num_states() == fst.num_states()